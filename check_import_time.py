@@ -0,0 +1,78 @@
+"""Cold-start import check for streamlit_app.py.
+
+Runs the app's module-level imports in a fresh interpreter under
+``python -X importtime`` and fails if a lazily-loaded dependency is pulled in
+eagerly or the total import time exceeds the budget.
+
+    python check_import_time.py [--budget SECONDS] [--report N]
+"""
+import argparse
+import ast
+import os
+import subprocess
+import sys
+
+APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'streamlit_app.py')
+IMPORT_BUDGET_S = 2.5  # cold import of the module-level dependencies
+LAZY_MODULES = ('bs4', 'docx', 'PIL')  # must only load through _lazy_import()
+
+
+def module_level_imports(path=APP):
+    """Return the source of every top-level import statement in the app."""
+    with open(path, encoding='utf-8') as f:
+        tree = ast.parse(f.read(), path)
+    return [ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+
+
+def parse_importtime(stderr):
+    """Return [(cumulative_us, depth, name)] from -X importtime output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((int(cumulative), depth, name.strip()))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--budget', type=float, default=IMPORT_BUDGET_S, help='seconds (default %(default)s)')
+    parser.add_argument('--report', type=int, default=15, help='slowest imports to print')
+    args = parser.parse_args()
+
+    # interpreter start-up imports (site, encodings, ...) are not the app's cost
+    baseline = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'pass'],
+                              capture_output=True, text=True)
+    startup = {name for _, _, name in parse_importtime(baseline.stderr)}
+
+    code = '\n'.join(module_level_imports())
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        print(proc.stderr.splitlines()[-1] if proc.stderr else 'import failed', file=sys.stderr)
+        return 1
+    rows = [r for r in parse_importtime(proc.stderr) if r[2] not in startup]
+
+    top_level = [r for r in rows if r[1] == 0]
+    total_s = sum(r[0] for r in top_level) / 1e6
+    for cumulative, _, name in sorted(top_level, reverse=True)[:args.report]:
+        print(f"{cumulative / 1000:9.1f} ms  {name}")
+
+    failures = []
+    loaded = {name for _, _, name in rows}
+    eager = [m for m in LAZY_MODULES if m in loaded]
+    if eager:
+        failures.append(f"loaded eagerly: {', '.join(eager)}")
+    if total_s > args.budget:
+        failures.append(f"import time {total_s:.2f}s exceeds budget {args.budget:.2f}s")
+
+    print(f"total: {total_s:.2f}s (budget {args.budget:.2f}s)")
+    for msg in failures:
+        print(f"FAIL: {msg}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,22 +1,30 @@
+import time
 import streamlit as st
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
-from bs4 import BeautifulSoup, NavigableString
-from docx import Document
 from io import BytesIO
-import zipfile
-import time
 import random
-from PIL import Image
+import importlib
+import json
+import sys
 from urllib.parse import urljoin, urlparse, urlunparse
 import io
 import re
 import html
 import logging
 import tempfile
+import zipfile
 import os
+import socket
+import threading
 from concurrent.futures import ThreadPoolExecutor, as_completed
+# bs4, docx and PIL are heavy and only needed by individual tabs;
+# they are imported on first use through _lazy_import() below.
+# (check_import_time.py verifies this and the cold-start import budget.)
+
+# start of this script run; reruns reuse cached modules, so imports above cost ~0 here
+_SCRIPT_START = time.perf_counter()
 
 # --- 1. SET PAGE CONFIG (Must be first) ---
 st.set_page_config(page_title="CUIMC Web Extractor", page_icon="🩺", layout="wide")
@@ -32,6 +40,29 @@ if 'active_name' not in st.session_state:
     st.session_state.active_name = ""
 if 'bulk_zip' not in st.session_state:
     st.session_state.bulk_zip = None
+if 'bulk_jsonl' not in st.session_state:
+    st.session_state.bulk_jsonl = None
+
+# --- LAZY IMPORTS & RERUN BUDGET ---
+RERUN_BUDGET_S = 1.5  # target wall time from script start up to the tab bodies (excludes button work)
+
+@st.cache_resource
+def _import_times():
+    # process-wide record of {module: seconds spent on its first import}
+    return {}
+
+# bound on the main thread so worker threads can record imports without a script context
+import_times = _import_times()
+
+def _lazy_import(name):
+    """Import a heavy module on first use, recording how long the import took."""
+    mod = sys.modules.get(name)
+    if mod is not None:
+        return mod
+    t0 = time.perf_counter()
+    mod = importlib.import_module(name)
+    import_times[name] = time.perf_counter() - t0
+    return mod
 
 # --- 3. CUIMC THEMING ---
 def apply_custom_style():
@@ -48,7 +79,22 @@ def apply_custom_style():
 
 
 # --- HTTP session with retries ---
-def setup_session(retries=3, backoff_factor=0.3, status_forcelist=(429, 500, 502, 503, 504)):
+# Upper bound for the bulk concurrency slider; each user session gets its own pool
+# sized to match, so one run's workers don't overflow it ("connection pool is full").
+MAX_CONCURRENCY = 10
+# Number of distinct hosts (page + image CDNs) whose pools are kept alive at once.
+POOL_HOSTS = 32
+# The DNS cache replaces socket.getaddrinfo for the whole server process (every
+# session and library, not just this session) from the first script run onward.
+# Set EXTRACTOR_DNS_CACHE=0 to disable it, or EXTRACTOR_DNS_TTL to change the TTL.
+DNS_CACHE_ENABLED = os.environ.get('EXTRACTOR_DNS_CACHE', '1') != '0'
+DNS_TTL = int(os.environ.get('EXTRACTOR_DNS_TTL', '300'))  # seconds a resolved address is reused
+DNS_CACHE_MAX = 4096  # entries kept before expired/oldest ones are evicted
+JSONL_PREFIX = 'cuimc_batch_'  # temp-file prefix for bulk JSONL output
+JSONL_MAX_AGE_S = 24 * 3600  # JSONL files older than this (e.g. from expired sessions) are removed
+
+def setup_session(retries=3, backoff_factor=0.3, status_forcelist=(429, 500, 502, 503, 504),
+                  pool_connections=POOL_HOSTS, pool_maxsize=MAX_CONCURRENCY):
     s = requests.Session()
     retry = Retry(
         total=retries,
@@ -58,14 +104,98 @@ def setup_session(retries=3, backoff_factor=0.3, status_forcelist=(429, 500, 502
         status_forcelist=status_forcelist,
         allowed_methods=frozenset(['GET', 'POST', 'HEAD', 'OPTIONS'])
     )
-    adapter = HTTPAdapter(max_retries=retry)
+    # pool_connections: how many host pools are cached; pool_maxsize: keep-alive
+    # connections retained per host. pool_block=False lets a burst open extra
+    # connections instead of stalling when every pooled one is busy.
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=pool_connections,
+                          pool_maxsize=pool_maxsize, pool_block=False)
     s.mount('https://', adapter)
     s.mount('http://', adapter)
     s.headers.update({'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36'})
     return s
 
-# shared session
-session = setup_session()
+def install_dns_cache(ttl=DNS_TTL, max_entries=DNS_CACHE_MAX):
+    """Wrap socket.getaddrinfo with a TTL cache (once per process) and return the cache stats."""
+    if hasattr(socket.getaddrinfo, 'dns_stats'):
+        # already installed by an earlier script run; don't stack another wrapper
+        return socket.getaddrinfo.dns_stats
+    orig_getaddrinfo = socket.getaddrinfo
+    cache = {}
+    stats = {'hits': 0, 'misses': 0, 'entries': cache}
+    cache_lock = threading.Lock()
+
+    def cached_getaddrinfo(*args, **kwargs):
+        key = (args, tuple(sorted(kwargs.items())))
+        now = time.monotonic()
+        with cache_lock:
+            hit = cache.get(key)
+            if hit and hit[0] > now:
+                stats['hits'] += 1
+                return hit[1]
+        result = orig_getaddrinfo(*args, **kwargs)
+        with cache_lock:
+            if len(cache) >= max_entries:
+                for k in [k for k, (expires, _) in cache.items() if expires <= now]:
+                    del cache[k]
+                # still full: drop the oldest insertions
+                while len(cache) >= max_entries:
+                    del cache[next(iter(cache))]
+            cache[key] = (now + ttl, result)
+            stats['misses'] += 1
+        return result
+
+    cached_getaddrinfo.__wrapped__ = orig_getaddrinfo
+    cached_getaddrinfo.dns_stats = stats
+    socket.getaddrinfo = cached_getaddrinfo
+    return stats
+
+def pool_stats(s):
+    """Return per-host pool usage: list of dicts with host, connections opened, requests, idle."""
+    rows = []
+    seen = set()
+    for adapter in s.adapters.values():
+        if id(adapter) in seen:
+            continue
+        seen.add(id(adapter))
+        pools = adapter.poolmanager.pools
+        try:
+            # snapshot the container directly; pools.get() would bump each pool's LRU position
+            with pools.lock:
+                snapshot = list(pools._container.values())
+        except AttributeError:
+            # urllib3 internals changed; fall back to host names from the public keys
+            rows.extend({'host': f"{k.key_scheme}://{k.key_host}", 'connections': None,
+                         'requests': None, 'idle': None} for k in pools.keys())
+            continue
+        for pool in snapshot:
+            try:
+                # the queue is pre-filled with None placeholders; only real entries are idle connections
+                idle = sum(1 for c in list(pool.pool.queue) if c is not None) if pool.pool is not None else 0
+            except AttributeError:
+                idle = None
+            rows.append({
+                'host': f"{pool.scheme}://{pool.host}",
+                'connections': pool.num_connections,
+                'requests': pool.num_requests,
+                'idle': idle,
+            })
+    rows.sort(key=lambda r: r['requests'] or 0, reverse=True)
+    return rows
+
+# DNS cache is process-wide; the HTTP session (and its pools) is per user session
+dns_stats = install_dns_cache() if DNS_CACHE_ENABLED else None
+if 'http_session' not in st.session_state:
+    st.session_state.http_session = setup_session()
+session = st.session_state.http_session
+
+# precompiled patterns and constant tables (built once per process)
+_WS_RE = re.compile(r'\s+')
+_IMAGE_ATTRS = ('srcset', 'data-srcset', 'data-src', 'data-original', 'data-lazy', 'src')
+_JUNK_KEYWORDS = ('logo', 'icon', 'social', 'facebook', 'twitter', 'instagram', 'svg', 'button', 'bg', 'footer')
+_STRIP_TAGS = ["script", "style", "nav", "footer", "header", "form", "iframe", "noscript"]
+_TAGS_TO_SAVE = ['p', 'h1', 'h2', 'h3', 'h4', 'li', 'blockquote', 'figure']
+_BOLD_TAGS = frozenset(('b', 'strong'))
+_ITALIC_TAGS = frozenset(('em', 'i'))
 
 # small helpers for image parsing
 def _parse_srcset(srcset_val):
@@ -87,8 +217,7 @@ def _parse_srcset(srcset_val):
 
 def _extract_image_candidate(img_tag, base_url):
     # try common attributes in order, prefer srcset candidates with largest width
-    attrs = ['srcset', 'data-srcset', 'data-src', 'data-original', 'data-lazy', 'src']
-    for a in attrs:
+    for a in _IMAGE_ATTRS:
         val = img_tag.get(a)
         if not val:
             continue
@@ -116,34 +245,41 @@ def _normalize_url(u):
     except Exception:
         return u
 
+def list_image_candidates(soup, base_url, junk_keywords=_JUNK_KEYWORDS):
+    """Return de-duplicated, non-junk image URLs from a parsed page without downloading them."""
+    urls = []
+    seen = set()
+    for img in soup.find_all('img'):
+        img_url = _extract_image_candidate(img, base_url)
+        if not img_url:
+            continue
+        norm = _normalize_url(img_url)
+        if norm in seen:
+            continue
+        seen.add(norm)
+        lower = img_url.lower()
+        if any(k in lower for k in junk_keywords):
+            continue
+        urls.append(img_url)
+    return urls
+
 def scrape_images_from_page(page_url, min_w=200, min_h=150, junk_keywords=None):
     """Return list of (filename, bytes, source_url) and list of failures (url, error)"""
     if junk_keywords is None:
-        junk_keywords = ['logo', 'icon', 'social', 'facebook', 'twitter', 'instagram', 'svg', 'button', 'bg', 'footer']
+        junk_keywords = _JUNK_KEYWORDS
+    BeautifulSoup = _lazy_import('bs4').BeautifulSoup
+    Image = _lazy_import('PIL.Image')
 
     results = []
     failures = []
-    seen = set()
 
     try:
         resp = session.get(page_url, timeout=15)
         resp.raise_for_status()
         soup = BeautifulSoup(resp.content, 'html.parser')
 
-        for img in soup.find_all('img'):
+        for img_url in list_image_candidates(soup, page_url, junk_keywords):
             try:
-                img_url = _extract_image_candidate(img, page_url)
-                if not img_url:
-                    continue
-                norm = _normalize_url(img_url)
-                if norm in seen:
-                    continue
-                seen.add(norm)
-
-                lower = img_url.lower()
-                if any(k in lower for k in junk_keywords):
-                    continue
-
                 r = session.get(img_url, timeout=10)
                 r.raise_for_status()
 
@@ -175,7 +311,7 @@ def scrape_images_from_page(page_url, min_w=200, min_h=150, junk_keywords=None):
                 results.append((name, img_buffer.getvalue(), img_url))
             except Exception as e:
                 logging.exception("image extraction error")
-                failures.append((img.get('src') or 'unknown', str(e)))
+                failures.append((img_url, str(e)))
 
     except Exception as e:
         logging.exception("page fetch failed")
@@ -185,12 +321,14 @@ def scrape_images_from_page(page_url, min_w=200, min_h=150, junk_keywords=None):
 
 
 # --- 4. SCRAPING & FORMATTING LOGIC ---
-def extract_content(url, retries=2):
+def extract_content(url, retries=2, image_manifest=None):
     """
     Extract textual content from a page and return (title, formatted_data).
     formatted_data: list of chunks {'tag': tag, 'content': [(type, value), ...]}
     types: 'text', 'bold', 'italic', 'link'
+    If image_manifest is a list, it is filled with the page's image URLs (no downloads).
     """
+    bs4 = _lazy_import('bs4')
     attempt = 0
     while attempt <= retries:
         try:
@@ -205,7 +343,9 @@ def extract_content(url, retries=2):
                 return None, "RATE_LIMIT_ERROR"
 
             response.raise_for_status()
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = bs4.BeautifulSoup(response.text, 'html.parser')
+            if image_manifest is not None:
+                image_manifest[:] = list_image_candidates(soup, url)
 
             page_title = soup.find('h1')
             if page_title:
@@ -214,43 +354,42 @@ def extract_content(url, retries=2):
                 url_parts = [p for p in url.split('/') if p]
                 title_text = url_parts[-1] if url_parts else "Extracted_Page"
 
-            for element in soup(["script", "style", "nav", "footer", "header", "form", "iframe", "noscript"]):
+            for element in soup(_STRIP_TAGS):
                 element.decompose()
 
             content_area = soup.find('main') or soup.find('article') or soup.body
             formatted_data = []
-            tags_to_save = ['p', 'h1', 'h2', 'h3', 'h4', 'li', 'blockquote', 'figure']
 
-            for element in content_area.find_all(tags_to_save):
-                if element.find_parent(tags_to_save):
+            for element in content_area.find_all(_TAGS_TO_SAVE):
+                if element.find_parent(_TAGS_TO_SAVE):
                     continue
 
                 chunk = {'tag': element.name, 'content': []}
 
                 for child in element.children:
-                    if isinstance(child, NavigableString):
-                        text_content = re.sub(r'\s+', ' ', str(child)).strip()
+                    if isinstance(child, bs4.NavigableString):
+                        text_content = _WS_RE.sub(' ', str(child)).strip()
                         if text_content:
                             chunk['content'].append(('text', text_content))
                     else:
                         name = (child.name or '').lower()
-                        if name in ['b', 'strong']:
+                        if name in _BOLD_TAGS:
                             txt = child.get_text(separator=' ', strip=True)
                             if txt:
-                                chunk['content'].append(('bold', re.sub(r'\s+', ' ', txt)))
-                        elif name in ['em', 'i']:
+                                chunk['content'].append(('bold', _WS_RE.sub(' ', txt)))
+                        elif name in _ITALIC_TAGS:
                             txt = child.get_text(separator=' ', strip=True)
                             if txt:
-                                chunk['content'].append(('italic', re.sub(r'\s+', ' ', txt)))
+                                chunk['content'].append(('italic', _WS_RE.sub(' ', txt)))
                         elif name == 'a':
                             link_text = child.get_text(separator=' ', strip=True)
                             href = child.get('href')
                             if link_text:
-                                chunk['content'].append(('link', (re.sub(r'\s+', ' ', link_text), href)))
+                                chunk['content'].append(('link', (_WS_RE.sub(' ', link_text), href)))
                         else:
                             txt = child.get_text(separator=' ', strip=True)
                             if txt:
-                                chunk['content'].append(('text', re.sub(r'\s+', ' ', txt)))
+                                chunk['content'].append(('text', _WS_RE.sub(' ', txt)))
 
                 # check for non-empty content
                 has_text = any(
@@ -272,7 +411,7 @@ def extract_content(url, retries=2):
                 return None, str(e)
 
 def create_word_doc(title, formatted_data):
-    doc = Document()
+    doc = _lazy_import('docx').Document()
     doc.add_heading(title, 0)
 
     for chunk in formatted_data:
@@ -379,6 +518,43 @@ def create_html(title, formatted_data):
     bio.seek(0)
     return bio
 
+def page_record(url, title, formatted_data, images=None, timings=None, error=None):
+    """Build one JSONL record for a page. Chunk content tuples serialize as JSON arrays."""
+    return {
+        'url': url,
+        'title': title,
+        'chunks': formatted_data if isinstance(formatted_data, list) else [],
+        'images': [{'src': src} for src in (images or [])],
+        'timings': timings or {},
+        'error': error,
+    }
+
+def remove_jsonl(path):
+    """Delete a bulk JSONL output file if it still exists."""
+    if path and os.path.exists(path):
+        try:
+            os.remove(path)
+        except OSError:
+            logging.exception("could not remove %s", path)
+
+def cleanup_stale_jsonl(max_age_s=JSONL_MAX_AGE_S):
+    """Remove JSONL outputs left behind by sessions that expired without clearing them."""
+    tmp_dir = tempfile.gettempdir()
+    cutoff = time.time() - max_age_s
+    for name in os.listdir(tmp_dir):
+        if name.startswith(JSONL_PREFIX) and name.endswith('.jsonl'):
+            path = os.path.join(tmp_dir, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except OSError:
+                pass
+
+def write_jsonl_record(fp, record):
+    """Append a record as a single JSON line and flush so consumers see it immediately."""
+    fp.write(json.dumps(record, ensure_ascii=False) + '\n')
+    fp.flush()
+
 def clean_filename(title):
     clean = "".join([c for c in title if c.isalnum() or c==' ']).strip().replace(' ', '_')
     return clean if clean else "extracted_content"
@@ -395,13 +571,29 @@ with st.sidebar:
     st.header("📜 Session History")
     for item in reversed(st.session_state.history):
         st.write(f"• {item}")
+    # filled at the end of the script so it reflects this run's requests
+    pool_panel = st.container()
     if st.button("Clear All Data"):
         st.session_state.history = []
         st.session_state.total_converted = 0
         st.session_state.active_file = None
         st.session_state.bulk_zip = None
+        remove_jsonl(st.session_state.bulk_jsonl)
+        st.session_state.bulk_jsonl = None
         st.rerun()
 
+# --- RERUN BUDGET REPORT ---
+# Measured before the tab bodies so button-triggered work (bulk runs, scraping) is excluded.
+_rerun_elapsed = time.perf_counter() - _SCRIPT_START
+if _rerun_elapsed > RERUN_BUDGET_S:
+    logging.warning("rerun took %.2fs before tabs (budget %.2fs); lazy imports: %s",
+                    _rerun_elapsed, RERUN_BUDGET_S, import_times)
+with st.sidebar:
+    with st.expander("⏱️ Rerun time"):
+        st.caption(f"Rerun before tabs: {_rerun_elapsed:.2f}s (budget {RERUN_BUDGET_S:.1f}s)")
+        for mod_name, secs in sorted(import_times.items(), key=lambda kv: kv[1], reverse=True):
+            st.caption(f"{mod_name}: {secs * 1000:.0f} ms on first use")
+
 # --- 4 TABS ---
 tab1, tab2, tab3, tab4 = st.tabs(["📄 Single URL (Word)", "📦 Bulk ZIP (Word)", "🖼️ Extract Images (ZIP)", "🗂️ Extract ALL (Word + Images)"])
 
@@ -460,7 +652,7 @@ with tab2:
     bulk_input = st.text_area("Paste URLs (one per line):", height=200)
     col_conc, col_html = st.columns([2, 1])
     with col_conc:
-        concurrency = st.slider("Concurrent requests", min_value=1, max_value=10, value=5,
+        concurrency = st.slider("Concurrent requests", min_value=1, max_value=MAX_CONCURRENCY, value=5,
                                 help="Higher = faster, but more likely to trigger rate limits on some sites")
     with col_html:
         html_only = st.checkbox("HTML pages only", value=True,
@@ -468,7 +660,22 @@ with tab2:
 
     path_filter_input = st.text_input("Only include URLs containing paths (comma-separated, e.g., /blog/, /news/):", help="Leave blank to include all URLs.")
 
+    col_fmt, col_opts = st.columns([2, 1])
+    with col_fmt:
+        output_format = st.radio("Output format", ["Word + HTML (ZIP)", "JSONL (one record per page)"], horizontal=True,
+                                 help="JSONL skips document rendering and streams each page as soon as it finishes")
+    jsonl_mode = output_format.startswith("JSONL")
+    with col_opts:
+        jsonl_images = st.checkbox("Include image manifest", value=False, disabled=not jsonl_mode,
+                                   help="List each page's image URLs in the record (images are not downloaded)")
+        jsonl_stdout = st.checkbox("Echo records to stdout", value=False, disabled=not jsonl_mode,
+                                   help="Write each record to the server's stdout for piping into other tools")
+
     if st.button("Process Bulk List", key="btn_bulk"):
+        # a new run replaces whichever output (ZIP or JSONL) the previous one left
+        st.session_state.bulk_zip = None
+        remove_jsonl(st.session_state.bulk_jsonl)
+        st.session_state.bulk_jsonl = None
         raw_list = [u.strip() for u in bulk_input.split('\n') if u.strip()]
 
         if path_filter_input.strip():
@@ -490,7 +697,6 @@ with tab2:
         if url_list:
             # ── per-URL status tracking ──────────────────────────────────
             # States: 0=pending, 1=fetching, 2=done, 3=failed
-            import threading
             from collections import defaultdict
             statuses = [0] * len(url_list)   # 0=pending 1=fetching 2=done 3=failed
             lock = threading.Lock()
@@ -524,32 +730,60 @@ with tab2:
                 with lock:
                     statuses[idx] = 1        # fetching
                 domain = urlparse(url).netloc
+                timings = {}
+                images = [] if (jsonl_mode and jsonl_images) else None
                 with domain_sems[domain]:    # max 1 concurrent request per domain
-                    title, data = extract_content(url)
+                    t0 = time.perf_counter()
+                    title, data = extract_content(url, image_manifest=images)
+                    timings['extract_s'] = round(time.perf_counter() - t0, 3)
                 with lock:
                     statuses[idx] = 2 if (data and isinstance(data, list)) else 3
-                return idx, url, title, data
+                return idx, url, title, data, images, timings
 
             render_grid()
             results_map = {}
             failed_urls = []
 
-            zip_buffer = BytesIO()
-            zipf = zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED)
+            success_count = 0
+            completed = False
+            if jsonl_mode:
+                # stream records to disk in completion order; nothing is held in memory per page
+                cleanup_stale_jsonl()
+                out = tempfile.NamedTemporaryFile('w', encoding='utf-8', prefix=JSONL_PREFIX,
+                                                  suffix='.jsonl', delete=False)
+                zipf = None
+            else:
+                zip_buffer = BytesIO()
+                zipf = zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED)
             try:
                 with ThreadPoolExecutor(max_workers=concurrency) as executor:
                     futures = [executor.submit(fetch_url_tracked, (i, u))
                                for i, u in enumerate(url_list)]
                     for future in as_completed(futures):
-                        idx, url, title, data = future.result()
+                        idx, url, title, data, images, timings = future.result()
                         render_grid()   # update UI on the main thread after each completion
-                        if data and isinstance(data, list):
+                        ok = bool(data and isinstance(data, list))
+                        if not ok and not (isinstance(data, str) and data):
+                            data = "NO_CONTENT"   # keep the error a string, never an empty chunk list
+                        if jsonl_mode:
+                            record = page_record(url, title, data, images, timings,
+                                                 error=None if ok else data)
+                            write_jsonl_record(out, record)
+                            if jsonl_stdout:
+                                write_jsonl_record(sys.stdout, record)
+                            if ok:
+                                # per-page titles would grow history (and the sidebar) by one
+                                # entry per page; a single summary entry is added after the run
+                                success_count += 1
+                                st.session_state.total_converted += 1
+                            else:
+                                failed_urls.append({'url': url, 'error': data})
+                        elif ok:
                             results_map[idx] = (url, title, data)
                         else:
                             failed_urls.append({'url': url, 'error': data})
 
                 # pack ZIP in original URL order
-                success_count = 0
                 for idx in sorted(results_map.keys()):
                     url, title, data = results_map[idx]
                     doc_io = create_word_doc(title, data)
@@ -561,19 +795,38 @@ with tab2:
                     if title not in st.session_state.history:
                         st.session_state.history.append(title)
                     success_count += 1
+                completed = True
             finally:
-                zipf.close()
+                if jsonl_mode:
+                    out.close()
+                    if not completed and success_count:
+                        # interrupted (error or rerun): keep the streamed records, marked partial
+                        partial_path = out.name[:-len('.jsonl')] + '.partial.jsonl'
+                        os.replace(out.name, partial_path)
+                        st.session_state.bulk_jsonl = partial_path
+                        st.session_state.history.append(f"JSONL batch (partial): {success_count} pages")
+                    elif not completed:
+                        remove_jsonl(out.name)
+                else:
+                    zipf.close()
 
             grid_placeholder.empty()
 
             if success_count > 0:
-                st.session_state.bulk_zip = zip_buffer.getvalue()
+                if jsonl_mode:
+                    st.session_state.bulk_jsonl = out.name
+                    logging.info("bulk JSONL written to %s", out.name)
+                    st.session_state.history.append(f"JSONL batch: {success_count} pages")
+                else:
+                    st.session_state.bulk_zip = zip_buffer.getvalue()
                 st.success(f"✅ Successfully processed {success_count} of {len(url_list)} URLs")
                 if failed_urls:
                     with st.expander(f"❌ {len(failed_urls)} failed URL(s)"):
                         for item in failed_urls:
                             st.write(f"- {item['url']}: {item['error']}")
             else:
+                if jsonl_mode:
+                    remove_jsonl(out.name)
                 st.error("All URLs failed — check that they are reachable HTML pages.")
         elif not skipped:
             st.warning("No URLs to process.")
@@ -585,6 +838,24 @@ with tab2:
             file_name="cuimc_batch_files.zip",
             mime="application/zip"
         )
+    if st.session_state.bulk_jsonl and os.path.exists(st.session_state.bulk_jsonl):
+        jsonl_path = st.session_state.bulk_jsonl
+        partial = jsonl_path.endswith('.partial.jsonl')
+        if partial:
+            st.warning("⚠️ The last JSONL run was interrupted; the file holds only the pages finished before it stopped.")
+        st.caption(f"JSONL output: {os.path.getsize(jsonl_path) / 1e6:.1f} MB. "
+                   "Downloading loads the whole file into memory; for very large runs use the stdout echo instead.")
+        # only load the file into Streamlit's media store when explicitly requested;
+        # on_click="ignore" keeps the download click from rerunning (and hiding) the button
+        if st.button("Prepare JSONL download", key="btn_jsonl_dl"):
+            with open(jsonl_path, 'rb') as jsonl_file:
+                st.download_button(
+                    label="📥 Download JSONL",
+                    data=jsonl_file,
+                    file_name="cuimc_batch_pages.partial.jsonl" if partial else "cuimc_batch_pages.jsonl",
+                    mime="application/x-ndjson",
+                    on_click="ignore"
+                )
 
 with tab3:
     st.header("🖼️ Extract & Convert Images")
@@ -717,3 +988,19 @@ with tab4:
                     
                 except Exception as e:
                     st.error(f"Full extraction failed. Error: {e}")
+
+# --- CONNECTION POOL PANEL ---
+# Computed only when toggled on; plain captions keep pandas/pyarrow off the rerun path.
+with pool_panel:
+    if st.toggle("🔌 Connection pool stats", key="show_pool_stats"):
+        rows = pool_stats(session)
+        if not rows:
+            st.caption("No connections opened yet.")
+        for row in rows:
+            st.caption(f"{row['host']}: {row['connections']} opened • "
+                       f"{row['requests']} requests • {row['idle']} idle")
+        if dns_stats is None:
+            st.caption("DNS cache disabled (EXTRACTOR_DNS_CACHE=0).")
+        else:
+            st.caption(f"DNS cache: {len(dns_stats['entries'])} entries • "
+                       f"{dns_stats['hits']} hits • {dns_stats['misses']} lookups")